@@ -8,7 +8,7 @@ from pathlib import Path
 from typing import Any
 
 import yaml
-from fastapi import Body, FastAPI, Form, Request
+from fastapi import Body, Depends, FastAPI, Form, Request
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
@@ -17,9 +17,20 @@ from exam_helper.ai_service import AIService
 from exam_helper.export_docx import render_project_docx_bytes
 from exam_helper.models import AIUsageTotals, DistractorFunction, MCChoice, ProjectConfig, Question, QuestionType
 from exam_helper.repository import ProjectRepository
-from exam_helper.solution_runtime import SolutionRuntimeError, run_answer_function, run_mc_harness
+from exam_helper.solution_runtime import run_answer_function, run_mc_harness
 from exam_helper.validation import validate_question
 
+_DEFAULT_MC_CHOICES_YAML = yaml.safe_dump(
+    [
+        {"label": "A", "content_md": "", "is_correct": True, "rationale": ""},
+        {"label": "B", "content_md": "", "is_correct": False, "rationale": ""},
+        {"label": "C", "content_md": "", "is_correct": False, "rationale": ""},
+        {"label": "D", "content_md": "", "is_correct": False, "rationale": ""},
+        {"label": "E", "content_md": "", "is_correct": False, "rationale": ""},
+    ],
+    sort_keys=False,
+)
+
 
 class AutosavePayload(BaseModel):
     title: str = ""
@@ -42,28 +53,37 @@ def _sanitize_docx_filename_stem(project_name: str) -> str:
     return stem or "exam"
 
 
+def make_ai_service(config: ProjectConfig, openai_key: str | None) -> AIService:
+    return AIService(
+        api_key=openai_key,
+        model=config.ai.model,
+        prompts_override=config.ai.prompts,
+    )
+
+
+def get_ai(request: Request) -> AIService:
+    return request.app.state.ai
+
+
+def bind_project(app: FastAPI, project_root: Path, repository: ProjectRepository | None = None) -> None:
+    repo = repository if repository is not None else ProjectRepository(project_root)
+    project = repo.load_project() if repo.project_file.exists() else ProjectConfig(name="(uninitialized)", course="")
+    app.state.project_root = project_root
+    app.state.repo = repo
+    app.state.ai = make_ai_service(project, app.state.openai_key)
+
+
 def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
     logger = logging.getLogger(__name__)
     logger.setLevel(logging.INFO)
     app = FastAPI(title="Exam Helper")
-    repo = ProjectRepository(project_root)
-    project = repo.load_project() if repo.project_file.exists() else ProjectConfig(name="(uninitialized)", course="")
-
-    def make_ai_service(config: ProjectConfig) -> AIService:
-        return AIService(
-            api_key=openai_key,
-            model=config.ai.model,
-            prompts_override=config.ai.prompts,
-        )
+    app.state.openai_key = openai_key
+    bind_project(app, project_root)
 
     def refresh_ai_service() -> None:
-        latest = repo.load_project()
-        app.state.ai = make_ai_service(latest)
+        latest = app.state.repo.load_project()
+        app.state.ai = make_ai_service(latest, openai_key)
 
-    app.state.project_root = project_root
-    app.state.openai_key = openai_key
-    app.state.repo = repo
-    app.state.ai = make_ai_service(project)
     templates = Jinja2Templates(directory=str(Path(__file__).parent / "templates"))
 
     def parse_parameters_yaml(raw_yaml: str) -> dict[str, Any]:
@@ -193,16 +213,6 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
             )
         return out
 
-    def default_mc_choices_yaml() -> str:
-        defaults = [
-            {"label": "A", "content_md": "", "is_correct": True, "rationale": ""},
-            {"label": "B", "content_md": "", "is_correct": False, "rationale": ""},
-            {"label": "C", "content_md": "", "is_correct": False, "rationale": ""},
-            {"label": "D", "content_md": "", "is_correct": False, "rationale": ""},
-            {"label": "E", "content_md": "", "is_correct": False, "rationale": ""},
-        ]
-        return yaml.safe_dump(defaults, sort_keys=False)
-
     def _render_template_from_parameters(template: str, params: dict[str, Any]) -> str:
         rendered = template or ""
         for key, value in (params or {}).items():
@@ -211,7 +221,7 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
 
     def _suggest_next_question_id() -> str:
         try:
-            existing = [q.id for q in repo.list_questions()]
+            existing = [q.id for q in app.state.repo.list_questions()]
         except Exception:
             existing = []
         used = set(existing)
@@ -241,14 +251,14 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
 
     @app.get("/", response_class=HTMLResponse)
     def home(request: Request) -> HTMLResponse:
-        questions = repo.list_questions() if repo.project_file.exists() else []
-        project = repo.load_project() if repo.project_file.exists() else None
+        questions = app.state.repo.list_questions() if app.state.repo.project_file.exists() else []
+        project = app.state.repo.load_project() if app.state.repo.project_file.exists() else None
         export_warning = request.cookies.get("exam_helper_export_warning")
         response = templates.TemplateResponse(
             request,
             "index.html",
             {
-                "project_root": str(project_root),
+                "project_root": str(app.state.project_root),
                 "project": project,
                 "questions": questions,
                 "export_warning": export_warning,
@@ -268,7 +278,7 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
             "question_form.html",
             {
                 "question": None,
-                "choices_yaml": default_mc_choices_yaml(),
+                "choices_yaml": _DEFAULT_MC_CHOICES_YAML,
                 "figures_json": "[]",
                 "solution_parameters_yaml": dump_parameters_yaml({}),
                 "distractor_functions_text": "",
@@ -279,8 +289,8 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
 
     @app.get("/questions/{question_id}/edit", response_class=HTMLResponse)
     def edit_question(request: Request, question_id: str) -> HTMLResponse:
-        q = repo.get_question(question_id)
-        choices_yaml = dump_choices_yaml(q.choices) if q.choices else default_mc_choices_yaml()
+        q = app.state.repo.get_question(question_id)
+        choices_yaml = dump_choices_yaml(q.choices) if q.choices else _DEFAULT_MC_CHOICES_YAML
         figures_json = json.dumps([f.model_dump(mode="json") for f in q.figures])
         solution_parameters_yaml = dump_parameters_yaml(q.solution.parameters)
         distractor_functions_text = dump_distractor_functions_text(q.solution.distractor_python_code)
@@ -300,9 +310,9 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
 
     @app.post("/questions/{question_id}/delete")
     def delete_question(question_id: str) -> RedirectResponse:
-        question = repo.get_question(question_id)
+        question = app.state.repo.get_question(question_id)
         question.is_deleted = True
-        repo.save_question(question)
+        app.state.repo.save_question(question)
         return RedirectResponse("/", status_code=303)
 
     @app.post("/questions/save")
@@ -323,7 +333,7 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
     ) -> RedirectResponse:
         existing = None
         try:
-            existing = repo.get_question(question_id)
+            existing = app.state.repo.get_question(question_id)
         except Exception:
             existing = None
         choices = parse_choices_yaml(choices_yaml)
@@ -354,7 +364,7 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
             }
         )
         _mark_typed_solution_stale_if_needed(existing, question)
-        repo.save_question(question)
+        app.state.repo.save_question(question)
         return RedirectResponse("/", status_code=303)
 
     @app.post("/questions/{question_id}/autosave")
@@ -362,7 +372,7 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
         try:
             existing = None
             try:
-                existing = repo.get_question(question_id)
+                existing = app.state.repo.get_question(question_id)
             except Exception:
                 existing = None
             choices = parse_choices_yaml(payload.choices_yaml)
@@ -393,30 +403,30 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
                 }
             )
             _mark_typed_solution_stale_if_needed(existing, question)
-            repo.save_question(question)
+            app.state.repo.save_question(question)
             return JSONResponse({"ok": True, "typed_solution_status": question.solution.typed_solution_status})
         except Exception as ex:
             return JSONResponse({"ok": False, "error": str(ex)}, status_code=422)
 
-    @app.post("/figures/validate")
+    @app.post("/figures/validate", response_model=None)
     def validate_figure(data_base64: str = Form(...)) -> dict:
         import base64
 
         raw = base64.b64decode(data_base64.encode("ascii"))
         return {"sha256": sha256(raw).hexdigest(), "size": len(raw)}
 
-    @app.post("/questions/{question_id}/validate")
+    @app.post("/questions/{question_id}/validate", response_model=None)
     def validate_question_endpoint(question_id: str) -> dict:
-        q = repo.get_question(question_id)
+        q = app.state.repo.get_question(question_id)
         errors = validate_question(q)
         return {"question_id": question_id, "errors": errors, "ok": not errors}
 
-    @app.post("/questions/{question_id}/ai/rewrite-and-parameterize")
-    def ai_rewrite_and_parameterize(question_id: str) -> dict:
+    @app.post("/questions/{question_id}/ai/rewrite-and-parameterize", response_model=None)
+    def ai_rewrite_and_parameterize(question_id: str, ai: AIService = Depends(get_ai)) -> dict:
         try:
-            q = repo.get_question(question_id)
-            result = app.state.ai.rewrite_parameterize(q)
-            repo.add_ai_usage(result.usage)
+            q = app.state.repo.get_question(question_id)
+            result = ai.rewrite_parameterize(q)
+            app.state.repo.add_ai_usage(result.usage)
             rendered_prompt = _render_template_from_parameters(result.question_template_md, result.parameters)
             title = q.title.strip()
             if not title:
@@ -431,14 +441,14 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
         except Exception as ex:
             return JSONResponse({"ok": False, "error": str(ex)}, status_code=422)
 
-    @app.post("/questions/{question_id}/ai/generate-answer-function")
-    def ai_generate_answer_function(question_id: str) -> dict:
+    @app.post("/questions/{question_id}/ai/generate-answer-function", response_model=None)
+    def ai_generate_answer_function(question_id: str, ai: AIService = Depends(get_ai)) -> dict:
         try:
-            q = repo.get_question(question_id)
+            q = app.state.repo.get_question(question_id)
             error_feedback = ""
             for _ in range(3):
-                result = app.state.ai.generate_answer_function(q, error_feedback=error_feedback)
-                repo.add_ai_usage(result.usage)
+                result = ai.generate_answer_function(q, error_feedback=error_feedback)
+                app.state.repo.add_ai_usage(result.usage)
                 try:
                     run_answer_function(result.answer_python_code, q.solution.parameters)
                     return {
@@ -455,10 +465,10 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
         except Exception as ex:
             return JSONResponse({"ok": False, "error": str(ex)}, status_code=422)
 
-    @app.post("/questions/{question_id}/harness/run")
+    @app.post("/questions/{question_id}/harness/run", response_model=None)
     def run_harness(question_id: str) -> dict:
         try:
-            q = repo.get_question(question_id)
+            q = app.state.repo.get_question(question_id)
             answer_result = run_answer_function(q.solution.answer_python_code, q.solution.parameters)
             payload: dict[str, Any] = {
                 "ok": True,
@@ -479,15 +489,15 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
                     payload["error"] = "MC options are not unique."
                     return JSONResponse(payload, status_code=422)
             q.solution.last_computed_answer_md = answer_result.answer_md
-            repo.save_question(q)
+            app.state.repo.save_question(q)
             return payload
         except Exception as ex:
             return JSONResponse({"ok": False, "error": str(ex)}, status_code=422)
 
-    @app.post("/questions/{question_id}/ai/generate-mc-distractors")
-    def ai_generate_mc_distractors(question_id: str) -> dict:
+    @app.post("/questions/{question_id}/ai/generate-mc-distractors", response_model=None)
+    def ai_generate_mc_distractors(question_id: str, ai: AIService = Depends(get_ai)) -> dict:
         try:
-            q = repo.get_question(question_id)
+            q = app.state.repo.get_question(question_id)
             if q.question_type != QuestionType.multiple_choice:
                 raise ValueError("Distractor generation is only available for multiple_choice questions.")
             last_collisions: list[str] = []
@@ -496,8 +506,8 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
             best_attempt = 0
             max_attempts = 3
             for attempt in range(1, max_attempts + 1):
-                result = app.state.ai.generate_distractor_functions(q)
-                repo.add_ai_usage(result.usage)
+                result = ai.generate_distractor_functions(q)
+                app.state.repo.add_ai_usage(result.usage)
                 last_funcs = result.distractors
                 harness = run_mc_harness(
                     answer_python_code=q.solution.answer_python_code,
@@ -541,12 +551,12 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
         except Exception as ex:
             return JSONResponse({"ok": False, "error": str(ex)}, status_code=422)
 
-    @app.post("/questions/{question_id}/ai/generate-typed-solution")
-    def ai_generate_typed_solution(question_id: str) -> dict:
+    @app.post("/questions/{question_id}/ai/generate-typed-solution", response_model=None)
+    def ai_generate_typed_solution(question_id: str, ai: AIService = Depends(get_ai)) -> dict:
         try:
-            q = repo.get_question(question_id)
-            result = app.state.ai.generate_typed_solution(q)
-            repo.add_ai_usage(result.usage)
+            q = app.state.repo.get_question(question_id)
+            result = ai.generate_typed_solution(q)
+            app.state.repo.add_ai_usage(result.usage)
             return {
                 "ok": True,
                 "typed_solution_md": result.text,
@@ -561,10 +571,10 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
             )
             return JSONResponse({"ok": False, "error": str(ex)}, status_code=422)
 
-    @app.post("/questions/{question_id}/ai/preview/{action}")
-    def ai_preview_prompt(question_id: str, action: str) -> dict:
+    @app.post("/questions/{question_id}/ai/preview/{action}", response_model=None)
+    def ai_preview_prompt(question_id: str, action: str, ai: AIService = Depends(get_ai)) -> dict:
         try:
-            q = repo.get_question(question_id)
+            q = app.state.repo.get_question(question_id)
             valid_actions = {
                 "rewrite-and-parameterize": "rewrite_parameterize",
                 "generate-answer-function": "generate_answer_function",
@@ -573,7 +583,7 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
             }
             if action not in valid_actions:
                 raise ValueError("Unknown preview action.")
-            preview = app.state.ai.preview_prompt(action=valid_actions[action], question=q)
+            preview = ai.preview_prompt(action=valid_actions[action], question=q)
             return {"ok": True, **preview}
         except Exception as ex:
             return JSONResponse({"ok": False, "error": str(ex)}, status_code=422)
@@ -582,9 +592,9 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
     def export_docx(include_solutions: str | None = Form(None)) -> Response:
         include = include_solutions is not None
         content, warnings = render_project_docx_bytes(
-            project_root=project_root, include_solutions=include
+            project_root=app.state.project_root, include_solutions=include
         )
-        project = repo.load_project()
+        project = app.state.repo.load_project()
         filename = f"{_sanitize_docx_filename_stem(project.name)}.docx"
         headers = {
             "Content-Disposition": f'attachment; filename="{filename}"',
@@ -612,12 +622,12 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
         prompt_solution_and_mc: str = Form(""),
         prompt_prompt_review: str = Form(""),
     ) -> RedirectResponse:
-        project = repo.load_project()
+        project = app.state.repo.load_project()
         project.ai.model = openai_model.strip() or "gpt-5.2"
         project.ai.prompts.overall = prompt_overall
         project.ai.prompts.solution_and_mc = prompt_solution_and_mc
         project.ai.prompts.prompt_review = prompt_prompt_review
-        repo.save_project(project)
+        app.state.repo.save_project(project)
         refresh_ai_service()
         return RedirectResponse("/", status_code=303)
 
@@ -629,28 +639,28 @@ def create_app(project_root: Path, openai_key: str | None) -> FastAPI:
         prompt_prompt_review: str = Form(""),
     ) -> JSONResponse:
         try:
-            project = repo.load_project()
+            project = app.state.repo.load_project()
             project.ai.model = openai_model.strip() or "gpt-5.2"
             project.ai.prompts.overall = prompt_overall
             project.ai.prompts.solution_and_mc = prompt_solution_and_mc
             project.ai.prompts.prompt_review = prompt_prompt_review
-            repo.save_project(project)
+            app.state.repo.save_project(project)
             refresh_ai_service()
             return JSONResponse({"ok": True})
         except Exception as ex:
             return JSONResponse({"ok": False, "error": str(ex)}, status_code=422)
 
-    @app.get("/openai/models")
-    def list_openai_models() -> dict:
+    @app.get("/openai/models", response_model=None)
+    def list_openai_models(ai: AIService = Depends(get_ai)) -> dict:
         try:
-            models = app.state.ai.list_models()
+            models = ai.list_models()
             return {"ok": True, "models": models}
         except Exception as ex:
             return JSONResponse({"ok": False, "error": str(ex), "models": []}, status_code=422)
 
     @app.post("/project/usage/reset")
     def reset_project_usage() -> RedirectResponse:
-        repo.reset_ai_usage()
+        app.state.repo.reset_ai_usage()
         return RedirectResponse("/", status_code=303)
 
     return app
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import cache
 from importlib.resources import files
 from string import Formatter
 import re
@@ -9,6 +10,16 @@ import yaml
 
 from exam_helper.models import AIPromptConfig, Question
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
+
+@cache
+def _template_fields(template: str) -> tuple[str, ...]:
+    return tuple(field_name for _, field_name, _, _ in Formatter().parse(template) if field_name)
+
 
 @dataclass(frozen=True)
 class PromptBundle:
@@ -21,9 +32,10 @@ class PromptCatalog:
         self._actions = actions
 
     @classmethod
+    @cache
     def from_package_yaml(cls) -> "PromptCatalog":
         data = files("exam_helper").joinpath("prompt_templates.yaml").read_text(encoding="utf-8")
-        raw = yaml.safe_load(data) or {}
+        raw = yaml.load(data, Loader=_YamlLoader) or {}
         actions = raw.get("actions")
         if not isinstance(actions, dict):
             raise ValueError("prompt_templates.yaml must define 'actions' mapping")
@@ -106,10 +118,8 @@ class PromptCatalog:
 
     @staticmethod
     def _safe_format(template: str, values: dict[str, str]) -> str:
-        formatter = Formatter()
-        allowed = set(values.keys())
-        for _, field_name, _, _ in formatter.parse(template):
-            if field_name and field_name not in allowed:
+        for field_name in _template_fields(template):
+            if field_name not in values:
                 raise ValueError(f"Unsupported template key: {field_name}")
         return template.format(**values)
 
@@ -6,6 +6,11 @@ import yaml
 
 from exam_helper.models import AIUsageTotals, ProjectConfig, Question
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
 
 class ProjectRepository:
     def __init__(self, root: Path):
@@ -25,7 +30,7 @@ class ProjectRepository:
         )
 
     def load_project(self) -> ProjectConfig:
-        raw = yaml.safe_load(self.project_file.read_text(encoding="utf-8"))
+        raw = yaml.load(self.project_file.read_text(encoding="utf-8"), Loader=_YamlLoader)
         return ProjectConfig.model_validate(raw)
 
     def save_project(self, project: ProjectConfig) -> None:
@@ -37,7 +42,7 @@ class ProjectRepository:
     def list_questions(self, include_deleted: bool = False) -> list[Question]:
         items: list[Question] = []
         for q_file in sorted(self.questions_dir.glob("*.yaml")):
-            raw = yaml.safe_load(q_file.read_text(encoding="utf-8"))
+            raw = yaml.load(q_file.read_text(encoding="utf-8"), Loader=_YamlLoader)
             question = Question.model_validate(raw)
             if question.is_deleted and not include_deleted:
                 continue
@@ -46,7 +51,7 @@ class ProjectRepository:
 
     def get_question(self, question_id: str) -> Question:
         q_file = self.questions_dir / f"{question_id}.yaml"
-        raw = yaml.safe_load(q_file.read_text(encoding="utf-8"))
+        raw = yaml.load(q_file.read_text(encoding="utf-8"), Loader=_YamlLoader)
         return Question.model_validate(raw)
 
     def save_question(self, question: Question) -> None:
@@ -58,23 +63,29 @@ class ProjectRepository:
         )
 
     def validate_all(self) -> list[str]:
+        errors, _ = self.validate_and_list_questions()
+        return errors
+
+    def validate_and_list_questions(self) -> tuple[list[str], list[Question]]:
         errors: list[str] = []
+        questions: list[Question] = []
         if not self.project_file.exists():
             errors.append("Missing project.yaml")
-            return errors
+            return errors, questions
         try:
             self.load_project()
         except Exception as ex:
             errors.append(f"project.yaml invalid: {ex}")
         for q_file in sorted(self.questions_dir.glob("*.yaml")):
             try:
-                raw = yaml.safe_load(q_file.read_text(encoding="utf-8"))
+                raw = yaml.load(q_file.read_text(encoding="utf-8"), Loader=_YamlLoader)
                 question = Question.model_validate(raw)
-                if question.is_deleted:
-                    continue
             except Exception as ex:
                 errors.append(f"{q_file.name}: {ex}")
-        return errors
+                continue
+            if not question.is_deleted:
+                questions.append(question)
+        return errors, questions
 
     def add_ai_usage(self, delta: AIUsageTotals) -> None:
         project = self.load_project()
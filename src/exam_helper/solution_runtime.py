@@ -3,15 +3,37 @@ from __future__ import annotations
 import math
 import re
 from dataclasses import dataclass
+from functools import cache, lru_cache
 from typing import Any
 
-import sympy as sp
-from pint import UnitRegistry
-
 from exam_helper.models import MCChoice
 
 
-ureg = UnitRegistry()
+_DIGIT = re.compile(r"\d")
+_OPERATOR = re.compile(r"[=+\-/*^]")
+_WHITESPACE_RUN = re.compile(r"\s+")
+_NUMBER = re.compile(r"[-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?")
+_BOLD_MARKUP = (
+    (re.compile(r"\*\*(.*?)\*\*", flags=re.DOTALL), r"\1"),
+    (re.compile(r"__(.*?)__", flags=re.DOTALL), r"\1"),
+    (re.compile(r"</?strong>", flags=re.IGNORECASE), ""),
+    (re.compile(r"</?b>", flags=re.IGNORECASE), ""),
+)
+
+
+# sympy and pint dominate import time; load them on the first solution run instead.
+@cache
+def _sympy():
+    import sympy
+
+    return sympy
+
+
+@cache
+def _unit_registry():
+    from pint import UnitRegistry
+
+    return UnitRegistry()
 
 
 class SolutionRuntimeError(RuntimeError):
@@ -37,13 +59,14 @@ class HarnessRunResult:
 
 
 def symbolic_equivalent(expr_a: str, expr_b: str) -> bool:
+    sp = _sympy()
     a = sp.sympify(expr_a)
     b = sp.sympify(expr_b)
     return sp.simplify(a - b) == 0
 
 
 def units_compatible(value_expr: str, expected_units: str) -> bool:
-    value = ureg(value_expr)
+    value = _unit_registry()(value_expr)
     return value.check(expected_units)
 
 
@@ -67,19 +90,24 @@ def _safe_globals() -> dict[str, Any]:
     return {
         "__builtins__": allowed_builtins,
         "math": math,
-        "sp": sp,
-        "ureg": ureg,
+        "sp": _sympy(),
+        "ureg": _unit_registry(),
         "symbolic_equivalent": symbolic_equivalent,
         "units_compatible": units_compatible,
     }
 
 
+@lru_cache(maxsize=256)
+def _compile_code(python_code: str):
+    return compile(python_code, "<string>", "exec")
+
+
 def _run_callable(python_code: str, fn_name: str, params: dict[str, Any]) -> tuple[Any, dict[str, Any]]:
     if not python_code.strip():
         raise SolutionRuntimeError("Python code is empty.")
     ns: dict[str, Any] = {}
     try:
-        exec(python_code, _safe_globals(), ns)
+        exec(_compile_code(python_code), _safe_globals(), ns)
     except Exception as ex:
         raise SolutionRuntimeError(f"Solution compile error: {ex}") from ex
     fn = ns.get(fn_name)
@@ -132,9 +160,9 @@ def run_distractor_function(python_code: str, params: dict[str, Any] | None = No
         t = (text or "").strip()
         if not t:
             return False
-        if re.search(r"\d", t):
+        if _DIGIT.search(t):
             return True
-        if re.search(r"[=+\-/*^]", t):
+        if _OPERATOR.search(t):
             return True
         return len(t) <= 40 and not _looks_explanatory(t)
 
@@ -154,12 +182,12 @@ def run_distractor_function(python_code: str, params: dict[str, Any] | None = No
 
 
 def _normalize_choice_text(value: str) -> str:
-    return re.sub(r"\s+", " ", (value or "").strip()).casefold()
+    return _WHITESPACE_RUN.sub(" ", (value or "").strip()).casefold()
 
 
 def _numeric_sort_key(value: str) -> float | None:
-    cleaned = re.sub(r",", "", value or "")
-    match = re.search(r"[-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?", cleaned)
+    cleaned = (value or "").replace(",", "")
+    match = _NUMBER.search(cleaned)
     if not match:
         return None
     try:
@@ -170,10 +198,8 @@ def _numeric_sort_key(value: str) -> float | None:
 
 def _strip_disallowed_bold(text: str) -> str:
     out = text or ""
-    out = re.sub(r"\*\*(.*?)\*\*", r"\1", out, flags=re.DOTALL)
-    out = re.sub(r"__(.*?)__", r"\1", out, flags=re.DOTALL)
-    out = re.sub(r"</?strong>", "", out, flags=re.IGNORECASE)
-    out = re.sub(r"</?b>", "", out, flags=re.IGNORECASE)
+    for pattern, replacement in _BOLD_MARKUP:
+        out = pattern.sub(replacement, out)
     return out
 
 
@@ -192,8 +218,12 @@ def run_mc_harness(
             "rationale": "correct answer",
         }
     ]
+    # Identical sources give identical results for the same params; run each once.
+    distractor_results: dict[str, DistractorRunResult] = {}
     for source_id, code in distractor_python_codes:
-        d = run_distractor_function(code, params)
+        d = distractor_results.get(code)
+        if d is None:
+            d = distractor_results[code] = run_distractor_function(code, params)
         rows.append(
             {
                 "source_id": source_id,
@@ -30,9 +30,9 @@ def validate_question(question: Question) -> list[str]:
 
 
 def validate_project(repo: ProjectRepository) -> list[str]:
-    errors = repo.validate_all()
+    errors, questions = repo.validate_and_list_questions()
     if errors:
         return errors
-    for q in repo.list_questions():
+    for q in questions:
         errors.extend(validate_question(q))
     return errors
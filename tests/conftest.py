@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from exam_helper.repository import ProjectRepository
+
+
+@pytest.fixture(scope="session")
+def _base_project(tmp_path_factory) -> Path:
+    root = tmp_path_factory.mktemp("base")
+    ProjectRepository(root).init_project("Exam", "Physics")
+    return root
+
+
+@pytest.fixture(scope="module")
+def _module_project_dir(tmp_path_factory) -> Path:
+    return tmp_path_factory.mktemp("project")
+
+
+@pytest.fixture
+def project_dir(_base_project: Path, _module_project_dir: Path) -> Path:
+    shutil.rmtree(_module_project_dir)
+    shutil.copytree(_base_project, _module_project_dir)
+    return _module_project_dir
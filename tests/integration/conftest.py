@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import re
+import subprocess
+from collections import Counter
+from collections.abc import Callable, Iterator
+from functools import lru_cache
+from pathlib import Path
+
+import pytest
+from docx import Document
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from exam_helper.app import bind_project, create_app, get_ai
+from exam_helper.models import Question
+from exam_helper.repository import ProjectRepository
+
+
+class _Sequence:
+    def __init__(self, *results):
+        self._results = iter(results)
+
+    def next(self):
+        return next(self._results)
+
+
+class _StubAI:
+    def __init__(self, **results):
+        self.results = results
+        self.calls: Counter[str] = Counter()
+
+    def __getattr__(self, name: str):
+        if name.startswith("_") or name not in self.results:
+            raise AttributeError(name)
+
+        def _call(*args, **kwargs):
+            self.calls[name] += 1
+            result = self.results[name]
+            if isinstance(result, _Sequence):
+                return result.next()
+            return result(*args, **kwargs) if callable(result) else result
+
+        return _call
+
+
+_MARKDOWN_DECORATION = re.compile(r"^(?:#+|\d+\.|[A-Z]\))\s+|\*")
+
+
+def _in_process_pandoc(cmd, check, capture_output, text, cwd):
+    # One paragraph per non-blank markdown line, with list markers and emphasis dropped.
+    markdown = Path(cmd[1]).read_text(encoding="utf-8")
+    doc = Document()
+    for line in markdown.splitlines():
+        if line.strip():
+            doc.add_paragraph(_MARKDOWN_DECORATION.sub("", line.strip()))
+    doc.save(cmd[cmd.index("-o") + 1])
+    return subprocess.CompletedProcess(cmd, 0, "", "")
+
+
+@pytest.fixture(autouse=True)
+def _no_pandoc(request, monkeypatch) -> None:
+    if request.node.get_closest_marker("uses_pandoc") is None:
+        monkeypatch.setattr("exam_helper.export_docx.subprocess.run", _in_process_pandoc)
+
+
+@pytest.fixture(scope="session")
+def app_skeleton(tmp_path_factory) -> Callable[[str | None], FastAPI]:
+    @lru_cache(maxsize=2)
+    def _app_skeleton(openai_key: str | None) -> FastAPI:
+        return create_app(tmp_path_factory.mktemp("app"), openai_key=openai_key)
+
+    return _app_skeleton
+
+
+@pytest.fixture(scope="session")
+def client(app_skeleton) -> Iterator[TestClient]:
+    with TestClient(app_skeleton("k")) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def keyless_client(app_skeleton) -> Iterator[TestClient]:
+    with TestClient(app_skeleton(None)) as c:
+        yield c
+
+
+@pytest.fixture
+def repo(client: TestClient, keyless_client: TestClient, project_dir: Path) -> ProjectRepository:
+    repo = ProjectRepository(project_dir)
+    for c in (client, keyless_client):
+        bind_project(c.app, project_dir, repository=repo)
+        c.cookies.clear()
+    return repo
+
+
+@pytest.fixture
+def seed_question(repo: ProjectRepository) -> Callable[..., Question]:
+    def _seed_question(question_id: str, **fields) -> Question:
+        question = Question(id=question_id, **fields)
+        repo.save_question(question)
+        return question
+
+    return _seed_question
+
+
+@pytest.fixture
+def stub_ai(client: TestClient) -> Iterator[Callable[..., _StubAI]]:
+    def _stub_ai(**results) -> _StubAI:
+        stub = _StubAI(**results)
+        client.app.dependency_overrides[get_ai] = lambda: stub
+        return stub
+
+    # Wrap per-call results in stub_ai.sequence(...); any other value is returned as-is.
+    _stub_ai.sequence = _Sequence
+    yield _stub_ai
+    client.app.dependency_overrides.clear()
@@ -2,32 +2,38 @@
 
 import base64
 import hashlib
+import json
 import yaml
 
 from fastapi.testclient import TestClient
 
-from exam_helper.app import create_app
+from exam_helper.models import Solution
 from exam_helper.repository import ProjectRepository
 
 
-def test_create_question_with_embedded_figure(tmp_path) -> None:
-    repo = ProjectRepository(tmp_path)
-    repo.init_project("Exam", "Physics")
-    app = create_app(tmp_path, openai_key=None)
-    client = TestClient(app)
+_LEGACY_QUESTION_YAML = yaml.safe_dump(
+    {
+        "id": "legacy",
+        "title": "Old",
+        "question_type": "free_response",
+        "prompt_md": "Prompt",
+        "choices": [],
+        "checker": {"python_code": "def grade(student_answer, context): return {}"},
+    },
+    sort_keys=False,
+    encoding="utf-8",
+)
 
+
+def test_create_question_with_embedded_figure(keyless_client: TestClient, repo: ProjectRepository) -> None:
     raw = b"image-bytes"
     b64 = base64.b64encode(raw).decode("ascii")
     digest = hashlib.sha256(raw).hexdigest()
-    fig = (
-        '[{"id":"fig_1","mime_type":"image/png","data_base64":"'
-        + b64
-        + '","sha256":"'
-        + digest
-        + '","caption":"test"}]'
+    fig = json.dumps(
+        [{"id": "fig_1", "mime_type": "image/png", "data_base64": b64, "sha256": digest, "caption": "test"}]
     )
 
-    resp = client.post(
+    resp = keyless_client.post(
         "/questions/save",
         data={
             "question_id": "q1",
@@ -48,27 +54,10 @@ def test_create_question_with_embedded_figure(tmp_path) -> None:
     assert len(saved.figures) == 1
 
 
-def test_save_clears_legacy_checker_data(tmp_path) -> None:
-    repo = ProjectRepository(tmp_path)
-    repo.init_project("Exam", "Physics")
-    question_path = tmp_path / "questions" / "legacy.yaml"
-    question_path.write_text(
-        yaml.safe_dump(
-            {
-                "id": "legacy",
-                "title": "Old",
-                "question_type": "free_response",
-                "prompt_md": "Prompt",
-                "choices": [],
-                "checker": {"python_code": "def grade(student_answer, context): return {}"},
-            },
-            sort_keys=False,
-        ),
-        encoding="utf-8",
-    )
-    app = create_app(tmp_path, openai_key=None)
-    client = TestClient(app)
-    resp = client.post(
+def test_save_clears_legacy_checker_data(keyless_client: TestClient, repo: ProjectRepository, project_dir) -> None:
+    question_path = project_dir / "questions" / "legacy.yaml"
+    question_path.write_bytes(_LEGACY_QUESTION_YAML)
+    resp = keyless_client.post(
         "/questions/save",
         data={
             "question_id": "legacy",
@@ -87,37 +76,19 @@ def test_save_clears_legacy_checker_data(tmp_path) -> None:
     assert "checker" not in raw
 
 
-def test_soft_delete_hides_question_but_keeps_yaml_on_disk(tmp_path) -> None:
-    repo = ProjectRepository(tmp_path)
-    repo.init_project("Exam", "Physics")
-    app = create_app(tmp_path, openai_key=None)
-    client = TestClient(app)
-
-    save = client.post(
-        "/questions/save",
-        data={
-            "question_id": "q1",
-            "title": "Delete Me",
-            "question_type": "free_response",
-            "question_template_md": "Prompt",
-            "choices_yaml": "[]",
-            "distractor_functions_text": "",
-            "typed_solution_md": "",
-            "figures_json": "[]",
-            "points": 5,
-        },
-        follow_redirects=False,
-    )
-    assert save.status_code == 303
+def test_soft_delete_hides_question_but_keeps_yaml_on_disk(
+    keyless_client: TestClient, repo: ProjectRepository, project_dir, seed_question
+) -> None:
+    seed_question("q1", title="Delete Me", solution=Solution(question_template_md="Prompt"))
 
-    delete = client.post("/questions/q1/delete", follow_redirects=False)
+    delete = keyless_client.post("/questions/q1/delete", follow_redirects=False)
     assert delete.status_code == 303
     assert delete.headers["location"] == "/"
 
-    home = client.get("/")
+    home = keyless_client.get("/")
     assert home.status_code == 200
     assert "/questions/q1/edit" not in home.text
 
-    question_file = tmp_path / "questions" / "q1.yaml"
+    question_file = project_dir / "questions" / "q1.yaml"
     assert question_file.exists()
     assert repo.get_question("q1").is_deleted is True
@@ -3,74 +3,93 @@ from __future__ import annotations
 import base64
 import hashlib
 import io
+import re
 import subprocess
 import zipfile
 from pathlib import Path
 
+import pytest
 from docx import Document
+from docx.oxml.ns import qn
+from lxml import etree
 
 from exam_helper.export_docx import export_project_to_docx, render_project_docx_bytes
 from exam_helper.models import FigureData, MCChoice, Question, QuestionType
 from exam_helper.repository import ProjectRepository
 
 
-def _document_xml_from_bytes(content: bytes) -> str:
-    with zipfile.ZipFile(io.BytesIO(content)) as zf:
-        return zf.read("word/document.xml").decode("utf-8")
+# 1x1 transparent PNG
+_TINY_PNG_B64 = (
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mP8"
+    "/w8AAgMBgU7Y5e0AAAAASUVORK5CYII="
+)
+_TINY_FIG = FigureData(
+    id="fig_1",
+    mime_type="image/png",
+    data_base64=_TINY_PNG_B64,
+    sha256=hashlib.sha256(base64.b64decode(_TINY_PNG_B64)).hexdigest(),
+    caption="tiny",
+)
 
+_CHOICES = [MCChoice(label=label, content_md=f"{label}1", is_correct=label == "A") for label in "ABCDE"]
+_MATH_CHOICES = [
+    MCChoice(label=label, content_md=f"${n}$", is_correct=label == "A") for n, label in enumerate("ABCDE", start=1)
+]
+_OPT_CHOICES = [MCChoice(label=label, content_md=f"opt {label}", is_correct=label == "A") for label in "ABCDE"]
 
-def test_export_docx_with_embedded_figure(tmp_path: Path) -> None:
-    repo = ProjectRepository(tmp_path)
-    repo.init_project("Exam", "Physics")
 
-    # 1x1 transparent PNG
-    b64 = (
-        "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mP8"
-        "/w8AAgMBgU7Y5e0AAAAASUVORK5CYII="
-    )
-    raw_hash = hashlib.sha256(base64.b64decode(b64.encode("ascii"))).hexdigest()
-    fig = FigureData(
-        id="fig_1",
-        mime_type="image/png",
-        data_base64=b64,
-        sha256=raw_hash,
-        caption="tiny",
-    )
+def _build_fake_pandoc_docx() -> bytes:
+    doc = Document()
+    for text in ("[5 points] Prompt", "opt A", "opt B", "Solution:", "Line 1"):
+        doc.add_paragraph(text)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+_FAKE_PANDOC_DOCX = _build_fake_pandoc_docx()
+
+
+def _has_tag(content: bytes, tag: str) -> bool:
+    target = qn(tag)
+    with zipfile.ZipFile(io.BytesIO(content)) as zf, zf.open("word/document.xml") as xml:
+        return any(elem.tag == target for _, elem in etree.iterparse(xml, events=("start",)))
+
+
+def _find_texts(texts: list[str], *needles: str) -> set[str]:
+    # One alternation scan per paragraph; needles must not overlap each other.
+    pattern = re.compile("|".join(map(re.escape, needles)))
+    return {m.group() for text in texts for m in pattern.finditer(text)}
+
+
+@pytest.mark.uses_pandoc
+def test_export_docx_with_embedded_figure(project_dir: Path) -> None:
+    repo = ProjectRepository(project_dir)
     q = Question(
         id="q1",
         title="t",
         points=5,
-        figures=[fig],
+        figures=[_TINY_FIG],
         solution={"question_template_md": "p"},
         question_type=QuestionType.multiple_choice,
-        choices=[
-            MCChoice(label="A", content_md="A1", is_correct=True),
-            MCChoice(label="B", content_md="B1", is_correct=False),
-            MCChoice(label="C", content_md="C1", is_correct=False),
-            MCChoice(label="D", content_md="D1", is_correct=False),
-            MCChoice(label="E", content_md="E1", is_correct=False),
-        ],
+        choices=_CHOICES,
     )
     repo.save_question(q)
 
-    out = tmp_path / "exam.docx"
-    warnings = export_project_to_docx(tmp_path, out)
+    out = project_dir / "exam.docx"
+    warnings = export_project_to_docx(project_dir, out)
     assert warnings == []
     assert out.exists()
     assert out.stat().st_size > 0
-    doc = Document(out)
-    text = "\n".join(p.text for p in doc.paragraphs)
-    assert "[5 points] p" in text
-    assert "A1" in text
-    assert "E1" in text
-    assert "Solution:" not in text
-    xml = _document_xml_from_bytes(out.read_bytes())
-    assert "<w:numPr>" in xml
+    content = out.read_bytes()
+    doc = Document(io.BytesIO(content))
+    found = _find_texts([p.text for p in doc.paragraphs], "[5 points] p", "A1", "E1", "Solution:")
+    assert found == {"[5 points] p", "A1", "E1"}
+    assert _has_tag(content, "w:numPr")
 
 
-def test_export_docx_includes_solution_when_enabled(tmp_path: Path) -> None:
-    repo = ProjectRepository(tmp_path)
-    repo.init_project("Exam", "Physics")
+def test_export_docx_includes_solution_when_enabled(project_dir: Path) -> None:
+    repo = ProjectRepository(project_dir)
     q = Question(
         id="q1",
         points=5,
@@ -80,17 +99,15 @@ def test_export_docx_includes_solution_when_enabled(tmp_path: Path) -> None:
         },
     )
     repo.save_question(q)
-    out = tmp_path / "exam_with_solution.docx"
-    export_project_to_docx(tmp_path, out, include_solutions=True)
-    doc = Document(out)
-    text = "\n".join(p.text for p in doc.paragraphs)
-    assert "Solution:" in text
-    assert "Line 1" in text
-    assert "Line 2" in text
-    assert "Problem (verbatim):" not in text
+    content, _ = render_project_docx_bytes(project_dir, include_solutions=True)
+    doc = Document(io.BytesIO(content))
+    paragraphs = doc.paragraphs
+    texts = [p.text for p in paragraphs]
+    found = _find_texts(texts, "Solution:", "Line 1", "Line 2", "Problem (verbatim):")
+    assert found == {"Solution:", "Line 1", "Line 2"}
 
     solution_paragraph = next(
-        p for p in doc.paragraphs if p.text.strip().startswith("Solution")
+        p for p, text in zip(paragraphs, texts) if text.strip().startswith("Solution")
     )
     assert solution_paragraph.paragraph_format.left_indent is not None
     assert solution_paragraph.runs
@@ -108,13 +125,7 @@ def test_export_docx_falls_back_when_pandoc_missing(tmp_path: Path, monkeypatch)
             "question_template_md": "Compute $v$ from \\(a t\\).",
             "typed_solution_md": "Problem (verbatim): Prompt\nline2",
         },
-        choices=[
-            MCChoice(label="A", content_md="$1$", is_correct=True),
-            MCChoice(label="B", content_md="$2$", is_correct=False),
-            MCChoice(label="C", content_md="$3$", is_correct=False),
-            MCChoice(label="D", content_md="$4$", is_correct=False),
-            MCChoice(label="E", content_md="$5$", is_correct=False),
-        ],
+        choices=_MATH_CHOICES,
     )
     repo.save_question(q)
 
@@ -127,12 +138,11 @@ def test_export_docx_falls_back_when_pandoc_missing(tmp_path: Path, monkeypatch)
     assert "Pandoc not available" in warnings[0]
 
     doc = Document(io.BytesIO(content))
-    text = "\n".join(p.text for p in doc.paragraphs)
-    assert "WARNING:" in text
-    assert "[5 points] Compute v from a t." in text
-    assert "Problem (verbatim):" not in text
-    xml = _document_xml_from_bytes(content)
-    assert "<w:numPr>" in xml
+    found = _find_texts(
+        [p.text for p in doc.paragraphs], "WARNING:", "[5 points] Compute v from a t.", "Problem (verbatim):"
+    )
+    assert found == {"WARNING:", "[5 points] Compute v from a t."}
+    assert _has_tag(content, "w:numPr")
 
 
 def test_export_docx_uses_a_paren_markers_for_pandoc_mc_lists(tmp_path: Path, monkeypatch) -> None:
@@ -143,13 +153,7 @@ def test_export_docx_uses_a_paren_markers_for_pandoc_mc_lists(tmp_path: Path, mo
         points=5,
         question_type=QuestionType.multiple_choice,
         solution={"question_template_md": "Prompt", "typed_solution_md": "Line 1"},
-        choices=[
-            MCChoice(label="A", content_md="opt A", is_correct=True),
-            MCChoice(label="B", content_md="opt B", is_correct=False),
-            MCChoice(label="C", content_md="opt C", is_correct=False),
-            MCChoice(label="D", content_md="opt D", is_correct=False),
-            MCChoice(label="E", content_md="opt E", is_correct=False),
-        ],
+        choices=_OPT_CHOICES,
     )
     repo.save_question(q)
 
@@ -158,14 +162,7 @@ def test_export_docx_uses_a_paren_markers_for_pandoc_mc_lists(tmp_path: Path, mo
         markdown = md_path.read_text(encoding="utf-8")
         assert "A) opt A" in markdown
         assert "B) opt B" in markdown
-        out_path = Path(cmd[cmd.index("-o") + 1])
-        d = Document()
-        d.add_paragraph("[5 points] Prompt")
-        d.add_paragraph("opt A")
-        d.add_paragraph("opt B")
-        d.add_paragraph("Solution:")
-        d.add_paragraph("Line 1")
-        d.save(out_path)
+        Path(cmd[cmd.index("-o") + 1]).write_bytes(_FAKE_PANDOC_DOCX)
         return subprocess.CompletedProcess(cmd, 0, "", "")
 
     monkeypatch.setattr("exam_helper.export_docx.subprocess.run", _fake_pandoc)
@@ -176,9 +173,8 @@ def test_export_docx_uses_a_paren_markers_for_pandoc_mc_lists(tmp_path: Path, mo
     assert any(p.text == "opt A" for p in doc.paragraphs)
 
 
-def test_export_docx_excludes_soft_deleted_questions(tmp_path: Path) -> None:
-    repo = ProjectRepository(tmp_path)
-    repo.init_project("Exam", "Physics")
+def test_export_docx_excludes_soft_deleted_questions(project_dir: Path) -> None:
+    repo = ProjectRepository(project_dir)
     repo.save_question(
         Question(
             id="q_active",
@@ -197,11 +193,9 @@ def test_export_docx_excludes_soft_deleted_questions(tmp_path: Path) -> None:
         )
     )
 
-    out = tmp_path / "exam_soft_delete.docx"
-    warnings = export_project_to_docx(tmp_path, out)
+    content, warnings = render_project_docx_bytes(project_dir)
     assert warnings == []
 
-    doc = Document(out)
-    text = "\n".join(p.text for p in doc.paragraphs)
-    assert "Active" in text
-    assert "Deleted" not in text
+    doc = Document(io.BytesIO(content))
+    found = _find_texts([p.text for p in doc.paragraphs], "Active", "Deleted")
+    assert found == {"Active"}
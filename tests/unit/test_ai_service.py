@@ -1,32 +1,34 @@
 from __future__ import annotations
 
+from collections.abc import Callable
+from types import SimpleNamespace
+
+import pytest
+
+from exam_helper import ai_service
 from exam_helper.ai_service import AIService
 from exam_helper.models import Question
 
 
-class _FakeResponses:
+class _FakeClient:
     def __init__(self, output_text: str):
-        self._output_text = output_text
+        self.responses = self
+        self._response = SimpleNamespace(output_text=output_text)
 
     def create(self, **kwargs):
-        class R:
-            pass
+        return self._response
 
-        r = R()
-        r.output_text = self._output_text
-        return r
 
+@pytest.fixture
+def fake_openai(monkeypatch) -> Callable[[str], None]:
+    def _fake_openai(output_text: str) -> None:
+        monkeypatch.setattr(ai_service, "OpenAI", lambda api_key: _FakeClient(output_text))
 
-class _FakeClient:
-    def __init__(self, output_text: str):
-        self.responses = _FakeResponses(output_text)
+    return _fake_openai
 
 
-def test_ai_service_rewrite_parameterize(monkeypatch) -> None:
-    from exam_helper import ai_service as mod
-
-    payload = """{"question_template_md":"A car moves at {{v}} m/s","parameters":{"v":12},"title":"Car Motion"}"""
-    monkeypatch.setattr(mod, "OpenAI", lambda api_key: _FakeClient(payload))
+def test_ai_service_rewrite_parameterize(fake_openai) -> None:
+    fake_openai("""{"question_template_md":"A car moves at {{v}} m/s","parameters":{"v":12},"title":"Car Motion"}""")
     svc = AIService(api_key="k")
     q = Question(id="q1", title="", prompt_md="old")
     out = svc.rewrite_parameterize(q)
@@ -35,22 +37,18 @@ def test_ai_service_rewrite_parameterize(monkeypatch) -> None:
     assert out.title == "Car Motion"
 
 
-def test_ai_service_generate_answer_function(monkeypatch) -> None:
-    from exam_helper import ai_service as mod
-
-    payload = """{"answer_python_code":"def solve(params):\\n    return {'answer_md':'x','final_answer':'x'}"}"""
-    monkeypatch.setattr(mod, "OpenAI", lambda api_key: _FakeClient(payload))
+def test_ai_service_generate_answer_function(fake_openai) -> None:
+    fake_openai("""{"answer_python_code":"def solve(params):\\n    return {'answer_md':'x','final_answer':'x'}"}""")
     svc = AIService(api_key="k")
     q = Question(id="q1", title="t", prompt_md="old")
     out = svc.generate_answer_function(q)
     assert "def solve(params)" in out.answer_python_code
 
 
-def test_ai_service_generate_distractor_functions(monkeypatch) -> None:
-    from exam_helper import ai_service as mod
-
-    payload = """{"distractors":[{"id":"d1","python_code":"def distractor(params):\\n    return {'distractor_md':'1','rationale':'r'}"},{"id":"d2","python_code":"def distractor(params):\\n    return {'distractor_md':'2','rationale':'r'}"},{"id":"d3","python_code":"def distractor(params):\\n    return {'distractor_md':'3','rationale':'r'}"},{"id":"d4","python_code":"def distractor(params):\\n    return {'distractor_md':'4','rationale':'r'}"}]}"""
-    monkeypatch.setattr(mod, "OpenAI", lambda api_key: _FakeClient(payload))
+def test_ai_service_generate_distractor_functions(fake_openai) -> None:
+    fake_openai(
+        """{"distractors":[{"id":"d1","python_code":"def distractor(params):\\n    return {'distractor_md':'1','rationale':'r'}"},{"id":"d2","python_code":"def distractor(params):\\n    return {'distractor_md':'2','rationale':'r'}"},{"id":"d3","python_code":"def distractor(params):\\n    return {'distractor_md':'3','rationale':'r'}"},{"id":"d4","python_code":"def distractor(params):\\n    return {'distractor_md':'4','rationale':'r'}"}]}"""
+    )
     svc = AIService(api_key="k")
     q = Question(id="q1", title="t", prompt_md="old")
     out = svc.generate_distractor_functions(q)
@@ -59,41 +57,36 @@ def test_ai_service_generate_distractor_functions(monkeypatch) -> None:
 
 def test_usage_parses_total_cost_from_formatted_string() -> None:
     svc = AIService(api_key="k")
-
-    class _Usage:
-        def model_dump(self):
-            return {
+    response = SimpleNamespace(
+        usage=SimpleNamespace(
+            model_dump=lambda: {
                 "input_tokens": 11,
                 "output_tokens": 7,
                 "total_tokens": 18,
                 "total_cost_usd": "$0.0123",
             }
+        )
+    )
 
-    class _Response:
-        usage = _Usage()
-
-    usage = svc._usage_from_response(_Response())
+    usage = svc._usage_from_response(response)
     assert usage.total_tokens == 18
     assert abs(usage.total_cost_usd - 0.0123) < 1e-9
 
 
-def test_generate_typed_solution_falls_back_to_plain_text(monkeypatch) -> None:
-    from exam_helper import ai_service as mod
-
-    monkeypatch.setattr(mod, "OpenAI", lambda api_key: _FakeClient("Worked solution in markdown."))
-    svc = AIService(api_key="k")
-    q = Question(id="q1", title="t")
-    out = svc.generate_typed_solution(q)
-    assert out.text == "Worked solution in markdown."
-
-
-def test_generate_typed_solution_extracts_typed_solution_md_from_yaml_like_payload(monkeypatch) -> None:
-    from exam_helper import ai_service as mod
-
-    payload = "typed_solution_md: |\n  Step 1: Use conservation.\n  Final: 2.0 m/s\n"
-    monkeypatch.setattr(mod, "OpenAI", lambda api_key: _FakeClient(payload))
+@pytest.mark.parametrize(
+    ("payload", "expected_lines"),
+    [
+        ("Worked solution in markdown.", ["Worked solution in markdown."]),
+        (
+            "typed_solution_md: |\n  Step 1: Use conservation.\n  Final: 2.0 m/s\n",
+            ["Step 1: Use conservation.", "Final: 2.0 m/s"],
+        ),
+    ],
+    ids=["plain-text", "yaml-like"],
+)
+def test_generate_typed_solution_extracts_text(fake_openai, payload: str, expected_lines: list[str]) -> None:
+    fake_openai(payload)
     svc = AIService(api_key="k")
     q = Question(id="q1", title="t")
     out = svc.generate_typed_solution(q)
-    assert "Step 1" in out.text
-    assert "Final: 2.0 m/s" in out.text
+    assert out.text.splitlines() == expected_lines
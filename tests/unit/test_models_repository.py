@@ -20,21 +20,33 @@ def test_figure_hash_round_trip() -> None:
     assert fig.sha256 == digest
 
 
-def test_repo_save_and_load_question(tmp_path: Path) -> None:
-    repo = ProjectRepository(tmp_path)
-    repo.init_project("Exam", "Physics")
+def test_repo_save_and_load_question(project_dir: Path) -> None:
+    repo = ProjectRepository(project_dir)
     q = Question(
         id="q1",
         title="Kinematics",
         prompt_md="Find acceleration.",
         mc_options_guidance="Avoid sign-error distractors.",
         question_type=QuestionType.free_response,
+        solution={
+            "question_template_md": (
+                "A 2 kg block slides down a 30° incline with μ = 0.2 between the block and the surface. "
+                "Find its acceleration along the incline, taking g = 9.8 m/s²."
+            ),
+            "typed_solution_md": (
+                "Resolve gravity along the incline: g sin θ = 4.9 m/s².\n"
+                "Friction opposes motion with magnitude μ g cos θ ≈ 1.70 m/s², so the net "
+                "acceleration along the incline is a ≈ 3.2 m/s² directed down the slope.\n"
+            ),
+        },
     )
     repo.save_question(q)
     loaded = repo.get_question("q1")
     assert loaded.title == "Kinematics"
     assert loaded.mc_options_guidance == "Avoid sign-error distractors."
     assert loaded.points == 5
+    question_file = project_dir / "questions" / "q1.yaml"
+    assert question_file.read_text(encoding="utf-8") == yaml.safe_dump(q.model_dump(mode="json"), sort_keys=False)
 
 
 def test_question_defaults_allow_empty_title() -> None:
@@ -80,9 +92,8 @@ def test_init_project_accepts_custom_model(tmp_path: Path) -> None:
     assert data["ai"]["model"] == "gpt-5.2-custom"
 
 
-def test_list_questions_excludes_soft_deleted_by_default(tmp_path: Path) -> None:
-    repo = ProjectRepository(tmp_path)
-    repo.init_project("Exam", "Physics")
+def test_list_questions_excludes_soft_deleted_by_default(project_dir: Path) -> None:
+    repo = ProjectRepository(project_dir)
     repo.save_question(Question(id="q_active", title="Active"))
     repo.save_question(Question(id="q_deleted", title="Deleted", is_deleted=True))
 
@@ -91,3 +102,14 @@ def test_list_questions_excludes_soft_deleted_by_default(tmp_path: Path) -> None
 
     all_questions = repo.list_questions(include_deleted=True)
     assert [q.id for q in all_questions] == ["q_active", "q_deleted"]
+
+
+def test_validate_and_list_questions_returns_errors_and_active_questions(project_dir: Path) -> None:
+    repo = ProjectRepository(project_dir)
+    repo.save_question(Question(id="q_active", title="Active"))
+    repo.save_question(Question(id="q_deleted", title="Deleted", is_deleted=True))
+    (project_dir / "questions" / "q_broken.yaml").write_text("id: [unclosed", encoding="utf-8")
+
+    errors, questions = repo.validate_and_list_questions()
+    assert [e.split(":")[0] for e in errors] == ["q_broken.yaml"]
+    assert [q.id for q in questions] == ["q_active"]
@@ -3,6 +3,13 @@ from __future__ import annotations
 from exam_helper.models import AIPromptConfig, Question
 from exam_helper.prompt_catalog import PromptCatalog
 
+_REWRITE_OVERRIDE = AIPromptConfig(overall="Always keep SI units.", prompt_review="Prefer minimal wording edits.")
+_SOLUTION_OVERRIDE = AIPromptConfig(solution_and_mc="Keep units explicit in final_answer.")
+
+
+def test_prompt_catalog_package_yaml_is_loaded_once() -> None:
+    assert PromptCatalog.from_package_yaml() is PromptCatalog.from_package_yaml()
+
 
 def test_prompt_catalog_builds_rewrite_prompt() -> None:
     catalog = PromptCatalog.from_package_yaml()
@@ -24,10 +31,7 @@ def test_prompt_catalog_applies_overall_and_rewrite_override() -> None:
     bundle = catalog.compose(
         action="rewrite_parameterize",
         question=q,
-        prompts_override=AIPromptConfig(
-            overall="Always keep SI units.",
-            prompt_review="Prefer minimal wording edits.",
-        ),
+        prompts_override=_REWRITE_OVERRIDE,
     )
     assert "Always keep SI units." in bundle.system_prompt
     assert "Prefer minimal wording edits." in bundle.system_prompt
@@ -39,7 +43,7 @@ def test_prompt_catalog_applies_solution_and_mc_override_to_answer_generation()
     bundle = catalog.compose(
         action="generate_answer_function",
         question=q,
-        prompts_override=AIPromptConfig(solution_and_mc="Keep units explicit in final_answer."),
+        prompts_override=_SOLUTION_OVERRIDE,
     )
     assert "Keep units explicit in final_answer." in bundle.system_prompt
 
@@ -26,6 +26,12 @@ def test_answer_function_requires_solve() -> None:
         run_answer_function("x = 1", {})
 
 
+def test_answer_function_reports_compile_error_on_every_call() -> None:
+    for _ in range(2):
+        with pytest.raises(SolutionRuntimeError, match="Solution compile error"):
+            run_answer_function("def solve(params):\n    return {", {})
+
+
 def test_distractor_function_success() -> None:
     code = (
         "def distractor(params):\n"
@@ -63,7 +69,7 @@ def test_harness_detects_collisions() -> None:
         [("d1", distractor_code), ("d2", distractor_code), ("d3", distractor_code), ("d4", distractor_code)],
         {},
     )
-    assert out.collisions
+    assert len(out.collisions) == 4
 
 
 def test_harness_sorts_numeric_then_text_tiebreak_by_source() -> None: